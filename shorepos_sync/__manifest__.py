@@ -9,12 +9,14 @@
     # 'version': '16.0.0.0',
     'version': '18.0.0.0',
     'external_dependencies': {
-        'python': ['filetype', 'numpy', 'opencv-python'],
+        'python': ['filetype', 'Pillow'],
     },
     'depends': ['account', 'contacts', 'queue_job', 'product', 'sale_management', 'stock'],
     'data': [
         'security/ir.model.access.csv',
         'data/sequence.xml',
+        'data/queue_job.xml',
+        'data/ir_cron.xml',
         # 'views/v16/product_product_form.xml',
         # 'views/v16/product_product_tree.xml',
         # 'views/v16/product_template_form.xml',
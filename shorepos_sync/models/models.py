@@ -1,20 +1,34 @@
 from base64 import b64decode
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta, UTC
 from decimal import Decimal
+from functools import lru_cache
+from http.cookiejar import DefaultCookiePolicy
 from io import BytesIO
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
+import threading
+from urllib3.util.retry import Retry
 import time
 from types import SimpleNamespace
 from typing import Any
 
-import cv2
 import filetype
-import numpy as np
+from PIL import Image
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from odoo import _, api, fields, models
-from odoo.addons.queue_job.delay import chain
+from odoo.addons.queue_job.delay import chain, group
+from odoo.addons.queue_job.exception import RetryableJobError
 from odoo.exceptions import UserError
 from odoo.release import version_info
 
@@ -22,11 +36,169 @@ from odoo.release import version_info
 # Settings
 _logger = logging.getLogger(__name__)
 
+# Odoo major version
+ODOO_VERSION = version_info[0]
+
+# Odoo domain condition for storable products ('detailed_type' has been replaced by 'is_storable' on Odoo 18)
+ODOO_PRODUCT_STORABLE_CONDITION = ('detailed_type', '=', 'product') if ODOO_VERSION == 16 else ('is_storable', '=', True)
+
+# Shore POS access tokens shared by all workers of the same process, keyed by client ID: {client_id: (access_token, expiry_date)}
+_shorepos_token_cache: dict[str, tuple[str, datetime]] = {}
+_shorepos_token_locks: dict[str, threading.Lock] = {}
+_shorepos_token_locks_guard = threading.Lock()
+
+# Refresh the access token slightly before it expires
+SHOREPOS_TOKEN_REFRESH_SKEW = timedelta(seconds=60)
+
+# Shore POS categories and tax rates shared across sync runs of the same process, keyed by database name and configuration ID, as a server process may serve several databases: {(database_name, configuration_id): (expiry_date, mapping)}
+_shorepos_category_cache: dict[tuple[str, int], tuple[datetime, dict[str, int]]] = {}
+_shorepos_tax_cache: dict[tuple[str, int], tuple[datetime, dict[Decimal, int]]] = {}
+_shorepos_lookup_cache_lock = threading.Lock()
+
+# Time after which the Shore POS categories and tax rates are retrieved again
+SHOREPOS_LOOKUP_CACHE_TTL = timedelta(minutes=5)
+
+# Maximum number of Shore POS API requests issued in parallel
+SHOREPOS_API_REQUEST_MAX_WORKERS = 8
+
+# Retry transient gateway errors of idempotent requests only (e.g. the 'adjust_inventory' PUT request applies a stock quantity delta, which must not be applied twice); the final response is returned so that 'raise_for_status' still raises an HTTPError
+SHOREPOS_HTTP_RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=frozenset({'GET', 'DELETE'}), raise_on_status=False)
+
+# Guards the creation of the HTTP session shared by all Shore POS API requests of the process
+_shorepos_session_lock = threading.Lock()
+
+# Configuration fields requiring a new Shore POS access token, respectively an update of the scheduled cron job, when changed
+SHOREPOS_AUTH_FIELDS = frozenset({'settings_shorepos_client_id', 'settings_shorepos_client_secret', 'settings_shorepos_refresh_token', 'settings_shorepos_api_endpoint_url'})
+SHOREPOS_CRON_FIELDS = frozenset({'settings_shorepos_sync_scheduled', 'settings_shorepos_sync_scheduled_interval_minutes', 'settings_shorepos_store_identifier'})
+
+# Fields of the configuration linking to its sync log records, keyed by sync log model
+SHOREPOS_SYNC_LOG_FIELDS = {'shorepos.sync.log': 'shorepos_sync_log_id', 'shorepos.stock.sync.log': 'shorepos_stock_sync_log_id'}
+
+# Number of products synced by each products sync queue job
+SHOREPOS_PRODUCTS_SYNC_JOB_BATCH_SIZE = 50
+
+# States of the queue jobs not done yet, respectively of the ones running or about to run (jobs waiting for a failed job stay in 'wait_dependencies')
+QUEUE_JOB_STATES_UNDONE = ('wait_dependencies', 'pending', 'enqueued', 'started')
+QUEUE_JOB_STATES_ACTIVE = ('pending', 'enqueued', 'started')
+
+# Number of products synced between two commits by the stock quantity sync
+SHOREPOS_STOCK_SYNC_BATCH_SIZE = 500
+
+# Package size units supported by Shore POS
+SHOREPOS_PACKAGE_SIZE_UNITS = frozenset({'ml', 'l', 'g', 'kg', 'm', 'm2', 'm3', 'pc'})
+
+
+def _shorepos_token_lock_get(client_id: str) -> threading.Lock:
+    """Returns the lock serializing the Shore POS access token refresh for a given client ID."""
+    with _shorepos_token_locks_guard:
+        return _shorepos_token_locks.setdefault(client_id, threading.Lock())
+
+
+def _shorepos_http_request(
+    session: requests.Session,
+    method: str,
+    url: str,
+    headers: dict[str, str],
+    params: dict[str, Any] | None = None,
+    data: Any | None = None,
+    json: dict[str, Any] | None = None,
+    files: dict[str, Any] | None = None,
+    timeout: int | float = 30,
+) -> Any:
+    """Sends a prepared Shore POS API request. Does not access the ORM, so it can be called from worker threads."""
+
+    # Serialize the payload with 'orjson' (considerably faster on large nested products), if installed
+    if json is not None and orjson:
+        data, json = orjson.dumps(json), None
+        headers = {**headers, 'Content-Type': 'application/json'}
+
+    response = session.request(method=method, url=url, headers=headers, params=params, data=data, json=json, files=files, timeout=timeout)
+    response.raise_for_status()
+
+    # Responses without body (e.g. "204 No Content" on delete)
+    if not response.content:
+        return None
+
+    # Parse with 'orjson' (considerably faster on large paginated responses), if installed
+    return orjson.loads(response.content) if orjson else response.json()
+
+
+def _shorepos_response_items(response: Any) -> list[dict[str, Any]] | None:
+    """Extracts the items of a (paginated) Shore POS API response."""
+    if isinstance(response, list):
+        return response
+
+    if isinstance(response, dict):
+        if 'results' in response and isinstance(response['results'], list):
+            return response['results']
+
+        elif 'data' in response:
+            return response['data']
+
+    return None
+
+
+def _shorepos_rate_limited(error: Exception) -> bool:
+    """Returns whether an error is a Shore POS API response rejecting a request because of the rate limit."""
+    return isinstance(error, HTTPError) and error.response is not None and error.response.status_code == 429
+
+
+def _image_file_type_guess(image: bytes) -> Any | None:
+    """Guesses the file type of an image from its magic bytes, only falling back to 'filetype' for uncommon formats."""
+    if image[:8] == b'\x89PNG\r\n\x1a\n':
+        return SimpleNamespace(mime='image/png', extension='png')
+
+    if image[:3] == b'\xff\xd8\xff':
+        return SimpleNamespace(mime='image/jpeg', extension='jpg')
+
+    if image[:4] == b'RIFF' and image[8:12] == b'WEBP':
+        return SimpleNamespace(mime='image/webp', extension='webp')
+
+    # 'filetype' only inspects the file header
+    return filetype.guess(image[:262])
+
+
+@contextmanager
+def _shorepos_advisory_lock(cr: Any, lock_name: str, configuration_id: int) -> Iterator[None]:
+    """Holds a PostgreSQL session-level advisory lock (kept across commits of 'cr'), serializing a critical section across the queue jobs of all Odoo processes."""
+    cr.execute(query='SELECT pg_advisory_lock(hashtext(%s), %s)', params=(lock_name, configuration_id))
+
+    try:
+        yield
+
+    except BaseException:
+        # An aborted transaction (e.g. on a serialization failure) rejects any statement until rolled back, which would prevent releasing the lock, kept by the connection once returned to the pool
+        if cr._cnx.get_transaction_status() == TRANSACTION_STATUS_INERROR:
+            cr.rollback()
+
+        raise
+
+    finally:
+        cr.execute(query='SELECT pg_advisory_unlock(hashtext(%s), %s)', params=(lock_name, configuration_id))
+
+
+@lru_cache(maxsize=8)
+def _shorepos_sync_domain(store_identifier: str | None, language_code: str | None, mode: str) -> tuple[tuple[str, str, Any], ...]:
+    """Returns the Odoo search conditions of the 'product.template' records to delete from Shore POS (mode 'delete') or to sync to Shore POS (mode 'sync')."""
+
+    if mode == 'delete':
+        return (('shorepos_store_identifier', '=', store_identifier), ('sync_to_shorepos', '=', False), ('shorepos_id', '!=', False))
+
+    search_conditions = (('sync_to_shorepos', '=', True), ('active', '=', True), ('default_code', '!=', False))
+
+    if language_code:
+        search_conditions += (('product_language_code', '=', language_code),)
+
+    return search_conditions
+
 
 class ShoreposConnector(models.Model):
     _name = 'shorepos.configuration'
     _description = 'Shore POS Configuration'
 
+    # HTTP session shared by all Shore POS API requests of the process
+    _shorepos_session: requests.Session | None = None
+
     # View settings
     shorepos_connection_sequence = fields.Char(string='Connection ID', required=True, copy=False, readonly=True, index=True, default=lambda self: _('New'))
 
@@ -76,15 +248,17 @@ class ShoreposConnector(models.Model):
 
     # Scheduled sync settings
     settings_shorepos_sync_scheduled = fields.Boolean('Enable auto-sync')
-    settings_shorepos_sync_scheduled_interval_minutes = fields.Integer(string='Interval (in Minutes)', default=5)
+    settings_shorepos_sync_scheduled_interval_minutes = fields.Integer(string='Interval (in Minutes)', default=15)
     ir_cron_id = fields.Many2one(comodel_name='ir.cron', string='Scheduled Cron Job', ondelete='cascade')
 
     # Last synced
     odoo_shorepos_last_sync = fields.Datetime(string='Last Synced', compute='odoo_shorepos_last_sync_assign', store=False, readonly=True)
+    shorepos_sync_log_id = fields.Many2one(comodel_name='shorepos.sync.log', string='Sync Log', readonly=True, copy=False, ondelete='set null')
+    shorepos_stock_sync_log_id = fields.Many2one(comodel_name='shorepos.stock.sync.log', string='Stock Sync Log', readonly=True, copy=False, ondelete='set null')
 
     def odoo_shorepos_last_sync_assign(self: models.Model) -> None:
         self.ensure_one()
-        sync_log = self.env['shorepos.sync.log'].search([], limit=1)
+        sync_log = self.sync_log_get('shorepos.sync.log')
         self.odoo_shorepos_last_sync = sync_log.odoo_shorepos_last_sync if sync_log else False
 
     @api.model_create_multi
@@ -112,9 +286,20 @@ class ShoreposConnector(models.Model):
 
         success = super().write(values)
 
+        auth_fields_changed = not SHOREPOS_AUTH_FIELDS.isdisjoint(values)
+        cron_fields_changed = not SHOREPOS_CRON_FIELDS.isdisjoint(values)
+
         for record in self:
-            record.shorepos_token_get()
-            record.cron_job_update()
+            if auth_fields_changed or 'settings_shorepos_store_identifier' in values:
+                # The configuration may now point to another Shore POS store
+                _shorepos_category_cache.pop((record.env.cr.dbname, record.id), None)
+                _shorepos_tax_cache.pop((record.env.cr.dbname, record.id), None)
+
+            if auth_fields_changed:
+                record.shorepos_token_get()
+
+            if cron_fields_changed:
+                record.cron_job_update()
 
         return success
 
@@ -128,35 +313,22 @@ class ShoreposConnector(models.Model):
     def cron_job_update(self: models.Model) -> None:
         self.ensure_one()
 
-        if version_info[0] == 16:
-            cron_values = {
-                'name': f'Shore POS Auto-Sync - {self.settings_shorepos_store_identifier}',
-                'model_id': self.env['ir.model']._get(self._name).id,
-                'code': (
-                    f'model.with_context(cron_running=True).browse({self.id}).with_delay().shorepos_sync()'
-                    if self.env['ir.module.module'].search([('name', '=', 'queue_job'), ('state', '=', 'installed')], limit=1)
-                    else f'model.with_context(cron_running=True).browse({self.id}).shorepos_sync()'
-                ),
-                'active': self.settings_shorepos_sync_scheduled,
-                'interval_number': self.settings_shorepos_sync_scheduled_interval_minutes,
-                'interval_type': 'minutes',
-                'numbercall': -1,
-                'doall': True,
-            }
+        cron_values = {
+            'name': f'Shore POS Auto-Sync - {self.settings_shorepos_store_identifier}',
+            'model_id': self.env['ir.model']._get(self._name).id,
+            'code': (
+                f'model.with_context(cron_running=True).browse({self.id}).with_delay().shorepos_sync(scheduled=True)'
+                if self.env['ir.module.module'].search_count([('name', '=', 'queue_job'), ('state', '=', 'installed')], limit=1)
+                else f'model.with_context(cron_running=True).browse({self.id}).shorepos_sync(scheduled=True)'
+            ),
+            'active': self.settings_shorepos_sync_scheduled,
+            'interval_number': self.settings_shorepos_sync_scheduled_interval_minutes,
+            'interval_type': 'minutes',
+        }
 
-        elif version_info[0] == 18:
-            cron_values = {
-                'name': f'Shore POS Auto-Sync - {self.settings_shorepos_store_identifier}',
-                'model_id': self.env['ir.model']._get(self._name).id,
-                'code': (
-                    f'model.with_context(cron_running=True).browse({self.id}).with_delay().shorepos_sync()'
-                    if self.env['ir.module.module'].search([('name', '=', 'queue_job'), ('state', '=', 'installed')], limit=1)
-                    else f'model.with_context(cron_running=True).browse({self.id}).shorepos_sync()'
-                ),
-                'active': self.settings_shorepos_sync_scheduled,
-                'interval_number': self.settings_shorepos_sync_scheduled_interval_minutes,
-                'interval_type': 'minutes',
-            }
+        # 'numbercall' and 'doall' have been removed on Odoo 18
+        if ODOO_VERSION == 16:
+            cron_values.update({'numbercall': -1, 'doall': True})
 
         # Update the existing cron job
         if self.ir_cron_id:
@@ -165,12 +337,18 @@ class ShoreposConnector(models.Model):
         elif self.settings_shorepos_sync_scheduled:
             self.ir_cron_id = self.env['ir.cron'].create(cron_values)
 
+    @api.model
+    def cron_jobs_update(self: models.Model) -> None:
+        """Updates the existing cron jobs of all configurations (called on module update, so that cron jobs created by a previous version run the current code)."""
+        for record in self.search([('ir_cron_id', '!=', False)]):
+            record.cron_job_update()
+
     def shorepos_sync_action(self: models.Model) -> dict[str, Any]:
         self.ensure_one()
         _logger.info("Manual 'Sync Now' button pressed, triggering background sync.")
 
         # Run shorepos_sync in the background (requires 'queue_job' add-on)
-        if self.env['ir.module.module'].search([('name', '=', 'queue_job'), ('state', '=', 'installed')], limit=1):
+        if self.env['ir.module.module'].search_count([('name', '=', 'queue_job'), ('state', '=', 'installed')], limit=1):
             self.with_delay().shorepos_sync()
 
             return {
@@ -197,46 +375,96 @@ class ShoreposConnector(models.Model):
                 },
             }
 
-    def shorepos_sync(self: models.Model) -> None:
+    def shorepos_sync(self: models.Model, scheduled: bool = False) -> None:
         self.ensure_one()
 
+        # Skip scheduled syncs piling up behind a slow sync of this configuration
+        if scheduled and any(queue_job.method_name != 'shorepos_sync' for queue_job in self.queue_jobs_get(QUEUE_JOB_STATES_ACTIVE)):
+            _logger.info('Skipped scheduled Shore POS sync: the previous sync is still running')
+            return None
+
         # Shore POS access token
-        if not self.settings_shorepos_token_expiry_date or fields.Datetime.now() >= self.settings_shorepos_token_expiry_date:
-            return self.shorepos_token_get()
+        if not self.shorepos_access_token_get():
+            return None
 
-        queue_jobs_run_in_sequence = []
+        # Serialize the syncs of this configuration (e.g. a manual sync running along a scheduled one), so that the products queued by a sync are not selected again by the other one
+        with _shorepos_advisory_lock(self.env.cr, 'shorepos_sync.sync', self.id):
+            # Start a new transaction once locked, so that the queue jobs committed meanwhile by another sync are read
+            self.env.cr.commit()
+
+            # Jobs of independent branches run in parallel, jobs within a branch run in sequence
+            queue_jobs_run_in_parallel = []
+            queue_jobs_run_in_sequence = []
+
+            # Odoo to Shore POS
+
+            ## Products
+            if self.settings_odoo_to_shorepos_products_sync:
+                ### Products delete (only affects products not synced to Shore POS anymore)
+                queue_jobs_run_in_parallel.append(self.delayable(priority=None, description=None).odoo_to_shorepos_products_delete())
+
+                ### Products and products variants (synced in parallel queue jobs, each one syncing a batch of products)
+                odoo_product_ids = self.odoo_to_shorepos_products_to_sync_get()
+                queue_jobs_products_sync = []
+                for batch_start in range(0, len(odoo_product_ids), SHOREPOS_PRODUCTS_SYNC_JOB_BATCH_SIZE):
+                    odoo_product_ids_batch = odoo_product_ids[batch_start : batch_start + SHOREPOS_PRODUCTS_SYNC_JOB_BATCH_SIZE]
+                    queue_jobs_products_sync.append(
+                        self.delayable(priority=10, description=f'Shore POS products sync ({len(odoo_product_ids_batch)} products)').odoo_to_shorepos_products_sync_batch(odoo_product_ids_batch)
+                    )
 
-        # Odoo to Shore POS
+                if queue_jobs_products_sync:
+                    queue_jobs_run_in_sequence.append(group(*queue_jobs_products_sync))
 
-        ## Products
-        if self.settings_odoo_to_shorepos_products_sync:
-            ### Products delete
-            queue_jobs_run_in_sequence.append(self.delayable(priority=None, description=None).odoo_to_shorepos_products_delete())
+            # Stock quantity (after the products sync, which links new products to Shore POS)
+            if self.settings_shorepos_products_stock_management:
+                queue_jobs_run_in_sequence.append(self.delayable(priority=None, description=None).odoo_shorepos_products_stock_quantity_sync_batch())
+                queue_jobs_run_in_sequence.append(self.delayable(priority=None, description=None).update_sync_last_log(model_name='shorepos.stock.sync.log', field_name='odoo_shorepos_last_sync'))
 
-            ### Products and products variants
-            queue_jobs_run_in_sequence.append(self.delayable(priority=None, description=None).odoo_to_shorepos_products_sync())
+            if queue_jobs_run_in_sequence:
+                queue_jobs_run_in_parallel.append(chain(*queue_jobs_run_in_sequence))
 
-        # Stock quantity
-        if self.settings_shorepos_products_stock_management:
-            queue_jobs_run_in_sequence.append(self.delayable(priority=None, description=None).odoo_shorepos_products_stock_quantity_sync_batch())
-            queue_jobs_run_in_sequence.append(self.delayable(priority=None, description=None).update_sync_last_log(model_name='shorepos.stock.sync.log', field_name='odoo_shorepos_last_sync'))
+            # Store 'odoo_shorepos_last_sync' once all branches are done
+            queue_job_sync_last_log = self.delayable(priority=None, description=None).update_sync_last_log(model_name='shorepos.sync.log', field_name='odoo_shorepos_last_sync')
 
-        # Store 'odoo_shorepos_last_sync'
-        queue_jobs_run_in_sequence.append(self.delayable(priority=None, description=None).update_sync_last_log(model_name='shorepos.sync.log', field_name='odoo_shorepos_last_sync'))
+            # Create graph and delay the jobs
+            if queue_jobs_run_in_parallel:
+                chain(group(*queue_jobs_run_in_parallel), queue_job_sync_last_log).delay()
 
-        # Create chain and delay the jobs
-        if queue_jobs_run_in_sequence:
-            chain(*queue_jobs_run_in_sequence).delay()
+            else:
+                queue_job_sync_last_log.delay()
+
+            # Commit the queued jobs before releasing the lock
+            self.env.cr.commit()
+
+    def queue_jobs_get(self: models.Model, states: tuple[str, ...], method_name: str | None = None) -> models.Model:
+        """Returns the queue jobs of this configuration in the given states (optionally only the ones of a method)."""
+        self.ensure_one()
+
+        search_conditions = [('model_name', '=', self._name), ('state', 'in', list(states))]
+
+        if method_name:
+            search_conditions.append(('method_name', '=', method_name))
+
+        return self.env['queue.job'].sudo().search(search_conditions).filtered(lambda queue_job: self.id in queue_job.record_ids)
+
+    def sync_log_get(self: models.Model, model_name: str) -> models.Model:
+        """Returns the sync log record of a sync log model for this configuration (linked by a Many2one field, so that no search is needed)."""
+        self.ensure_one()
+        return self[SHOREPOS_SYNC_LOG_FIELDS[model_name]]
 
-    @api.model
     def update_sync_last_log(self: models.Model, model_name: str, field_name: str) -> None:
-        sync_log = self.env[model_name].search([], limit=1)
+        self.ensure_one()
+
+        sync_log = self.sync_log_get(model_name)
+        now = fields.Datetime.now()
 
         if sync_log:
-            sync_log.write({field_name: fields.Datetime.now()})
+            # Skip rapid-fire updates
+            if not sync_log[field_name] or now - sync_log[field_name] >= timedelta(seconds=1):
+                sync_log.write({field_name: now})
 
         else:
-            self.env[model_name].create({field_name: fields.Datetime.now()})
+            self[SHOREPOS_SYNC_LOG_FIELDS[model_name]] = self.env[model_name].create({field_name: now})
 
     def shorepos_token_get(self: models.Model) -> bool | None:
         """Retrieves Shore POS access token and new refresh token."""
@@ -279,20 +507,107 @@ class ShoreposConnector(models.Model):
             _logger.error(f'Failed to get Shore POS access token; Response: {response_data}')
             return False
 
-        if shorepos_access_token:
+        shorepos_token_expiry_date = fields.Datetime.now() + timedelta(seconds=shorepos_refresh_token_new_expiry_date) if shorepos_refresh_token_new_expiry_date else self.settings_shorepos_token_expiry_date
+
+        # Skip storing the access token and its expiry date if Shore POS returned the ones already known
+        if shorepos_access_token != self.settings_shorepos_access_token:
             api_data['settings_shorepos_access_token'] = shorepos_access_token
 
+        if shorepos_refresh_token_new_expiry_date and shorepos_token_expiry_date != self.settings_shorepos_token_expiry_date:
+            api_data['settings_shorepos_token_expiry_date'] = shorepos_token_expiry_date
+
         if shorepos_refresh_token_new and shorepos_refresh_token_new != self.settings_shorepos_refresh_token:
             api_data['settings_shorepos_refresh_token'] = shorepos_refresh_token_new
 
-        if shorepos_refresh_token_new_expiry_date:
-            api_data['settings_shorepos_token_expiry_date'] = fields.Datetime.now() + timedelta(seconds=shorepos_refresh_token_new_expiry_date)
-
         if api_data:
             self.with_context(skip_token_refresh_write=True).write(api_data)
 
+        if shorepos_token_expiry_date:
+            _shorepos_token_cache[self.settings_shorepos_client_id] = (shorepos_access_token, shorepos_token_expiry_date)
+
         _logger.info('Shore POS API connection successful')
 
+    def shorepos_access_token_cached_get(self: models.Model) -> tuple[str | None, datetime | None]:
+        """Returns the cached Shore POS access token and its expiry date, replacing them by the ones stored in the database if these expire later (e.g. refreshed by another Odoo process, which also revokes the cached access token)."""
+        self.ensure_one()
+
+        client_id = self.settings_shorepos_client_id
+        access_token, expiry_date = _shorepos_token_cache.get(client_id, (None, None))
+
+        if self.settings_shorepos_access_token and self.settings_shorepos_token_expiry_date and (expiry_date is None or self.settings_shorepos_token_expiry_date > expiry_date):
+            access_token, expiry_date = self.settings_shorepos_access_token, self.settings_shorepos_token_expiry_date
+            _shorepos_token_cache[client_id] = (access_token, expiry_date)
+
+        return access_token, expiry_date
+
+    def shorepos_access_token_get(self: models.Model, rejected_access_token: str | None = None) -> str | None:
+        """Returns a valid Shore POS access token, refreshing it only if it is expired, about to expire or rejected by Shore POS."""
+        self.ensure_one()
+
+        client_id = self.settings_shorepos_client_id
+
+        def access_token_valid(access_token: str | None, expiry_date: datetime | None) -> bool:
+            return bool(access_token) and access_token != rejected_access_token and fields.Datetime.now() < expiry_date - SHOREPOS_TOKEN_REFRESH_SKEW
+
+        access_token, expiry_date = self.shorepos_access_token_cached_get()
+
+        if access_token_valid(access_token, expiry_date):
+            return access_token
+
+        # The refresh rotates the refresh token, so it is stored in a separate transaction committed right away, which is not rolled back if the calling job fails
+        with _shorepos_token_lock_get(client_id), self.env.registry.cursor() as token_cr:
+            with _shorepos_advisory_lock(token_cr, 'shorepos_sync.token', self.id):
+                # Start a new transaction once locked, so that the tokens committed meanwhile by another Odoo process are read
+                token_cr.commit()
+
+                token_configuration = self.with_env(self.env(cr=token_cr))
+                access_token, expiry_date = token_configuration.shorepos_access_token_cached_get()
+
+                if access_token_valid(access_token, expiry_date):
+                    return access_token
+
+                _shorepos_token_cache.pop(client_id, None)
+
+                if token_configuration.shorepos_token_get() is False:
+                    return None
+
+                token_cr.commit()
+
+                access_token, expiry_date = _shorepos_token_cache.get(client_id, (token_configuration.settings_shorepos_access_token, None))
+
+        return access_token
+
+    def shorepos_http_session_get(self: models.Model) -> requests.Session:
+        """Returns the HTTP session shared by all Shore POS API requests of the process, keeping connections alive between requests and sync runs. The session does not store cookies."""
+        if self.__class__._shorepos_session is None:
+            with _shorepos_session_lock:
+                if self.__class__._shorepos_session is None:
+                    session = requests.Session()
+                    session.headers.update({'Accept': 'application/json'})
+
+                    # The session is shared by all configurations and databases of the process, so cookies set by Shore POS for one store must not be sent with the requests of another
+                    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+                    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=SHOREPOS_HTTP_RETRY)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self.__class__._shorepos_session = session
+
+        return self.__class__._shorepos_session
+
+    def shorepos_api_request_prepare(self: models.Model, endpoint: str, api_version: str | None = None, body: bool = False) -> tuple[str, dict[str, str]]:
+        """Builds the URL and headers of a Shore POS API request."""
+        self.ensure_one()
+
+        headers = {
+            'Authorization': f'Bearer {self.shorepos_access_token_get()}',
+            'X-Api-Version': api_version or '13',
+        }
+        if body:
+            headers['Content-Type'] = 'application/json'
+
+        return f'{self.settings_shorepos_api_endpoint_url}/{endpoint}/', headers
+
     def shorepos_api_request(
         self: models.Model,
         method: str,
@@ -306,17 +621,77 @@ class ShoreposConnector(models.Model):
     ) -> dict[str, Any]:
         self.ensure_one()
 
-        headers = {
-            'Accept': 'application/json',
-            'Authorization': f'Bearer {self.settings_shorepos_access_token}',
-            'X-Api-Version': api_version or '13',
-        }
-        if (json is not None or data is not None) and not files:
-            headers['Content-Type'] = 'application/json'
+        url, headers = self.shorepos_api_request_prepare(endpoint=endpoint, api_version=api_version, body=(json is not None or data is not None) and not files)
+
+        try:
+            return _shorepos_http_request(session=self.shorepos_http_session_get(), method=method, url=url, headers=headers, params=params, data=data, json=json, files=files, timeout=timeout)
+
+        except HTTPError as error:
+            if error.response is None or error.response.status_code != 401:
+                raise
+
+            # The access token may have been revoked (e.g. refreshed by another Odoo process): refresh it and retry once
+            _logger.warning('Shore POS access token rejected, refreshing it and retrying...')
+            headers['Authorization'] = f'Bearer {self.shorepos_access_token_get(rejected_access_token=headers["Authorization"].removeprefix("Bearer "))}'
+
+            return _shorepos_http_request(session=self.shorepos_http_session_get(), method=method, url=url, headers=headers, params=params, data=data, json=json, files=files, timeout=timeout)
+
+    def shorepos_api_request_retry(self: models.Model, **kwargs: Any) -> Any:
+        """Sends a Shore POS API request, waiting and retrying as long as the rate limit is hit."""
+
+        self.ensure_one()
+
+        while True:
+            try:
+                return self.shorepos_api_request(**kwargs)
+
+            except HTTPError as error:
+                if _shorepos_rate_limited(error):
+                    retry_after = int(error.response.headers.get('Retry-After', 1))
+                    _logger.warning(f'Rate limit hit, retrying after {retry_after}s...')
+                    time.sleep(retry_after)
+                    continue
+                else:
+                    raise
+
+    def shorepos_api_requests_parallel(self: models.Model, method: str, requests_kwargs: list[dict[str, Any]]) -> list[Any]:
+        """Sends several Shore POS API requests in parallel, returning in order the response of each request or the exception it raised."""
+
+        self.ensure_one()
+
+        if not requests_kwargs:
+            return []
 
-        response = requests.request(method=method, url=f'{self.settings_shorepos_api_endpoint_url}/{endpoint}/', headers=headers, params=params, data=data, json=json, files=files, timeout=timeout)
-        response.raise_for_status()
-        return response.json()
+        session = self.shorepos_http_session_get()
+        responses = []
+
+        with ThreadPoolExecutor(max_workers=SHOREPOS_API_REQUEST_MAX_WORKERS) as executor:
+            futures = []
+            for request_kwargs in requests_kwargs:
+                http_request_kwargs = {key: value for key, value in request_kwargs.items() if key not in ('endpoint', 'api_version')}
+
+                # Build the request on the main thread, as the worker threads must not access the ORM
+                url, headers = self.shorepos_api_request_prepare(
+                    endpoint=request_kwargs['endpoint'],
+                    api_version=request_kwargs.get('api_version'),
+                    body=(request_kwargs.get('json') is not None or request_kwargs.get('data') is not None) and not request_kwargs.get('files'),
+                )
+                futures.append(executor.submit(_shorepos_http_request, session=session, method=method, url=url, headers=headers, **http_request_kwargs))
+
+            for request_kwargs, future in zip(requests_kwargs, futures, strict=True):
+                error = future.exception()
+
+                if isinstance(error, HTTPError) and error.response is not None and error.response.status_code in (401, 429):
+                    # Fall back to a sequential request refreshing a rejected access token, respectively honoring the 'Retry-After' header
+                    try:
+                        responses.append(self.shorepos_api_request_retry(method=method, **request_kwargs))
+                    except Exception as retry_error:
+                        responses.append(retry_error)
+
+                else:
+                    responses.append(error if error is not None else future.result())
+
+        return responses
 
     def shorepos_api_request_all(
         self: models.Model,
@@ -328,57 +703,93 @@ class ShoreposConnector(models.Model):
         json: dict[str, Any] | None = None,
         files: dict[str, Any] | None = None,
         timeout: int | float = 30,
+        filter_fn: Callable[[dict[str, Any]], bool] | None = None,
     ) -> list[dict[str, Any]]:
+        """Retrieves all pages of a Shore POS API endpoint. The first page is retrieved sequentially; if more pages exist, GET requests for the following pages are issued in parallel. If 'filter_fn' is given, only the items for which it returns True are kept."""
+
         self.ensure_one()
 
         items_all = []
-        page = 1
+
+        def items_keep(items: list[dict[str, Any]]) -> None:
+            items_all.extend(items if filter_fn is None else (item for item in items if filter_fn(item)))
 
         # Shore POS parameters
         if params is None:
             params = {}
         params.setdefault('limit', 100)
 
-        while True:
-            try:
-                params['page'] = page
+        def page_get(page: int) -> Any:
+            return self.shorepos_api_request_retry(method=method, endpoint=endpoint, api_version=api_version, params={**params, 'page': page}, data=data, json=json, files=files, timeout=timeout)
+
+        # First page
+        response = page_get(page=1)
+        items = _shorepos_response_items(response)
 
-                response = self.shorepos_api_request(method=method, endpoint=endpoint, api_version=api_version, params=params, data=data, json=json, files=files, timeout=timeout)
+        if not items:
+            return items_all
 
-                if not response:
+        items_keep(items)
+
+        if isinstance(response, list) or len(items) < params['limit']:
+            return items_all
+
+        # Last page, if Shore POS provides the total number of items
+        page_last = -(-response['count'] // params['limit']) if isinstance(response.get('count'), int) else None
+
+        if page_last is not None and page_last <= 1:
+            return items_all
+
+        # Only GET requests are safe to be issued in parallel
+        if method.lower() != 'get':
+            page = 2
+            while page_last is None or page <= page_last:
+                items = _shorepos_response_items(page_get(page=page))
+
+                if not items:
                     break
 
-                if isinstance(response, list):
-                    items_all.extend(response)
+                items_keep(items)
+
+                if len(items) < params['limit']:
                     break
 
-                if isinstance(response, dict):
-                    items = None
+                page += 1
 
-                    if 'results' in response and isinstance(response['results'], list):
-                        items = response['results']
+            return items_all
 
-                    elif 'data' in response:
-                        items = response['data']
+        page = 2
+        while True:
+            pages = range(page, page + SHOREPOS_API_REQUEST_MAX_WORKERS if page_last is None else min(page + SHOREPOS_API_REQUEST_MAX_WORKERS, page_last + 1))
+            responses = self.shorepos_api_requests_parallel(
+                method=method,
+                requests_kwargs=[
+                    {'endpoint': endpoint, 'api_version': api_version, 'params': {**params, 'page': page_number}, 'data': data, 'json': json, 'files': files, 'timeout': timeout} for page_number in pages
+                ],
+            )
+            page_last_reached = not pages or (page_last is not None and pages[-1] >= page_last)
 
-                    if items is not None:
-                        items_all.extend(items)
+            # Merge the pages in order
+            for response in responses:
+                if isinstance(response, Exception):
+                    raise response
 
-                        if len(items) < params['limit']:
-                            break
+                items = _shorepos_response_items(response)
 
-                        page += 1
-                        time.sleep(0.05)
-                        continue
+                if not items:
+                    page_last_reached = True
+                    break
 
-            except HTTPError as error:
-                if error.response.status_code == 429:
-                    retry_after = int(error.response.headers.get('Retry-After', 1))
-                    _logger.warning(f'Rate limit hit, retrying after {retry_after}s...')
-                    time.sleep(retry_after)
-                    continue
-                else:
-                    raise
+                items_keep(items)
+
+                if len(items) < params['limit']:
+                    page_last_reached = True
+                    break
+
+            if page_last_reached:
+                break
+
+            page += SHOREPOS_API_REQUEST_MAX_WORKERS
 
         return items_all
 
@@ -387,19 +798,28 @@ class ShoreposConnector(models.Model):
 
         self.ensure_one()
 
-        attributes = {}
+        # Prefetch the attribute and value names in batch
+        odoo_product.attribute_line_ids.mapped('attribute_id.name')
+        odoo_product.attribute_line_ids.mapped('value_ids.name')
+
+        # Attribute name (e.g. "color") mapped to the names of the selected values (e.g. ["S", "M", "L"])
+        return {attribute_line.attribute_id.name: attribute_line.value_ids.mapped('name') for attribute_line in odoo_product.attribute_line_ids}
+
+    def shorepos_lookup_cache_get(self: models.Model, cache: dict[tuple[str, int], tuple[datetime, dict[Any, int]]], fetch: Callable[[], dict[Any, int]], refresh: bool = False) -> dict[Any, int]:
+        """Returns a Shore POS lookup (e.g. categories or tax rates) cached for this configuration, fetching it again only once expired (or if 'refresh' is set)."""
+
+        self.ensure_one()
 
-        for attribute_line in odoo_product.attribute_line_ids:
-            # Get the attribute name (e.g. "color")
-            attribute_name = attribute_line.attribute_id.name
+        cache_key = (self.env.cr.dbname, self.id)
 
-            # Get the names of the selected values (e.g. ["S", "M", "L"])
-            value_names = [value.name for value in attribute_line.value_ids]
+        with _shorepos_lookup_cache_lock:
+            expiry_date, mapping = cache.get(cache_key, (None, None))
 
-            # Add to the attributes dictionary
-            attributes[attribute_name] = value_names
+            if refresh or mapping is None or fields.Datetime.now() >= expiry_date:
+                mapping = fetch()
+                cache[cache_key] = (fields.Datetime.now() + SHOREPOS_LOOKUP_CACHE_TTL, mapping)
 
-        return attributes
+        return mapping
 
     def shorepos_category_create_or_retrieve(self: models.Model, odoo_category: models.Model) -> int | None:
         """Create or retrieve a Shore POS category."""
@@ -409,20 +829,32 @@ class ShoreposConnector(models.Model):
         if not odoo_category:
             return None
 
-        try:
-            response = self.shorepos_api_request(method='get', endpoint='categories', params={'limit': 100})
-            shorepos_categories = {category['name']: category['id'] for category in response['data']}
+        def shorepos_categories_fetch():
+            return {category['name']: category['id'] for category in self.shorepos_api_request(method='get', endpoint='categories', params={'limit': 100})['data']}
 
-            shorepos_category_id = shorepos_categories.get(odoo_category.name)
+        try:
+            shorepos_category_id = self.shorepos_lookup_cache_get(_shorepos_category_cache, shorepos_categories_fetch).get(odoo_category.name)
 
             if not shorepos_category_id:
-                response = self.shorepos_api_request(method='post', endpoint='categories', json={'name': odoo_category.name})
-                _logger.info(f'Created new Odoo product category in Shore POS: {response.get("name")}')
-                shorepos_category_id = response.get('id')
+                # Serialize the creation across parallel sync jobs, retrieving the categories again once locked, so that a category created meanwhile by another job is not created twice
+                with _shorepos_advisory_lock(self.env.cr, 'shorepos_sync.categories', self.id):
+                    shorepos_categories = self.shorepos_lookup_cache_get(_shorepos_category_cache, shorepos_categories_fetch, refresh=True)
+                    shorepos_category_id = shorepos_categories.get(odoo_category.name)
+
+                    if not shorepos_category_id:
+                        response = self.shorepos_api_request(method='post', endpoint='categories', json={'name': odoo_category.name})
+                        _logger.info(f'Created new Odoo product category in Shore POS: {response.get("name")}')
+                        shorepos_category_id = response.get('id')
+
+                        if shorepos_category_id:
+                            shorepos_categories[odoo_category.name] = shorepos_category_id
 
             return shorepos_category_id
 
         except Exception as error:
+            if _shorepos_rate_limited(error):
+                raise
+
             _logger.error(f'Failed to create or retrieve Odoo category in Shore POS: {odoo_category}: {error}')
             return None
 
@@ -436,20 +868,32 @@ class ShoreposConnector(models.Model):
 
         odoo_tax_rate = Decimal(str(odoo_tax_rate))
 
-        try:
-            response = self.shorepos_api_request(method='get', endpoint='taxes')
-            shorepos_tax_rates = {Decimal(tax['tax_rate']): tax['id'] for tax in response}
+        def shorepos_tax_rates_fetch():
+            return {Decimal(tax['tax_rate']): tax['id'] for tax in self.shorepos_api_request(method='get', endpoint='taxes')}
 
-            shorepos_tax_rate_id = shorepos_tax_rates.get(odoo_tax_rate)
+        try:
+            shorepos_tax_rate_id = self.shorepos_lookup_cache_get(_shorepos_tax_cache, shorepos_tax_rates_fetch).get(odoo_tax_rate)
 
             if not shorepos_tax_rate_id:
-                response = self.shorepos_api_request(method='post', endpoint='taxes', json={'name': f'{odoo_tax_rate}%', 'tax_rate': odoo_tax_rate})
-                _logger.info(f'Created new Odoo tax rate in Shore POS: {response.get("name")}')
-                shorepos_tax_rate_id = response.get('id')
+                # Serialize the creation across parallel sync jobs, retrieving the tax rates again once locked, so that a tax rate created meanwhile by another job is not created twice
+                with _shorepos_advisory_lock(self.env.cr, 'shorepos_sync.taxes', self.id):
+                    shorepos_tax_rates = self.shorepos_lookup_cache_get(_shorepos_tax_cache, shorepos_tax_rates_fetch, refresh=True)
+                    shorepos_tax_rate_id = shorepos_tax_rates.get(odoo_tax_rate)
+
+                    if not shorepos_tax_rate_id:
+                        response = self.shorepos_api_request(method='post', endpoint='taxes', json={'name': f'{odoo_tax_rate}%', 'tax_rate': odoo_tax_rate})
+                        _logger.info(f'Created new Odoo tax rate in Shore POS: {response.get("name")}')
+                        shorepos_tax_rate_id = response.get('id')
+
+                        if shorepos_tax_rate_id:
+                            shorepos_tax_rates[odoo_tax_rate] = shorepos_tax_rate_id
 
             return shorepos_tax_rate_id
 
         except Exception as error:
+            if _shorepos_rate_limited(error):
+                raise
+
             _logger.error(f'Failed to create or retrieve Odoo tax rate in Shore POS: {odoo_tax_rate}%: {error}')
             return None
 
@@ -466,7 +910,7 @@ class ShoreposConnector(models.Model):
             image = b64decode(image)
 
             # Guess the file type from the decoded data
-            image_file_type = filetype.guess(image)
+            image_file_type = _image_file_type_guess(image)
 
             if not image_file_type:
                 _logger.error('Failed to determine Odoo product image type')
@@ -475,15 +919,12 @@ class ShoreposConnector(models.Model):
             # Convert if .webp
             if image_file_type.mime == 'image/webp':
                 try:
-                    # Encode the image back to PNG format
-                    is_success, buffer = cv2.imencode('.png', cv2.imdecode(np.frombuffer(buffer=image, dtype=np.uint8), cv2.IMREAD_UNCHANGED))
+                    # Encode the image to PNG format (favoring encoding speed over file size)
+                    buffer = BytesIO()
+                    Image.open(BytesIO(image)).save(buffer, format='PNG', optimize=False, compress_level=1)
 
-                    if is_success:
-                        # Get the PNG byte data
-                        image = buffer.tobytes()
-                    else:
-                        _logger.error('Failed to convert Odoo product image from .webp to .png')
-                        return None
+                    # Get the PNG byte data
+                    image = buffer.getvalue()
 
                     # Update the file type to reflect the new PNG format
                     image_file_type = SimpleNamespace(mime='image/png', extension='png')
@@ -501,47 +942,55 @@ class ShoreposConnector(models.Model):
             return shorepos_image_id
 
         except Exception as error:
+            if _shorepos_rate_limited(error):
+                raise
+
             _logger.error(f'Failed to upload Odoo product image to Shore POS: {error}')
             return None
 
-    def odoo_shorepos_products_stock_quantity_sync(self: models.Model, odoo_product: models.Model, shorepos_products_stock_map: dict[int, dict[str, Any]]) -> None:
-        self.ensure_one()
-        # Store Shore POS product ID in a list after Odoo data has been pushed to Shore POS
-        shorepos_product_ids_updated = {}
+    def odoo_shorepos_products_stock_quantity_sync(
+        self: models.Model,
+        odoo_product: models.Model,
+        product_shorepos_id: int,
+        shorepos_products_stock_map: dict[int, dict[str, Any]],
+        odoo_stock_quants_map: dict[int, models.Model],
+        location_id: int,
+        store_id: str,
+        odoo_stock_quants_to_write: dict[float, list[int]],
+        odoo_stock_quants_to_create: list[dict[str, Any]],
+        odoo_stock_last_sync_timestamps: dict[int, datetime],
+        shorepos_stock_adjustments_to_push: list[tuple[models.Model, int, dict[str, Any]]],
+    ) -> None:
+        """Compares the stock quantity of a single product, collecting the changes to apply to Odoo or to push to Shore POS."""
 
-        product_shorepos_id = int(odoo_product.shorepos_id) or int(odoo_product.product_tmpl_id.shorepos_id)
+        self.ensure_one()
 
         # Determine the corresponding Shore POS stock info
         shorepos_stock_info = shorepos_products_stock_map.get(product_shorepos_id)
 
         if not shorepos_stock_info:
-            return shorepos_product_ids_updated
+            return None
 
         # Shore POS product stock quantity
         shorepos_stock_quantity = float(shorepos_stock_info['quantity'])
 
         # Odoo product stock quant
-        odoo_product_stock_quant = self.env['stock.quant'].search(
-            [
-                ('product_tmpl_id.shorepos_store_identifier', '=', self.settings_shorepos_store_identifier),
-                ('product_id', '=', odoo_product.id),
-                ('location_id', '=', self.settings_shorepos_products_warehouse_location.lot_stock_id.id),
-            ],
-            limit=1,
-        )
+        odoo_product_stock_quant = odoo_stock_quants_map.get(odoo_product.id, self.env['stock.quant'])
 
         if odoo_product_stock_quant and shorepos_stock_quantity == odoo_product.qty_available:
-            return shorepos_product_ids_updated
+            return None
 
         # Get last update dates
         odoo_stock_quantity_last_update = getattr(odoo_product_stock_quant, 'stock_quantity_last_update', None) if odoo_product_stock_quant else None
         odoo_stock_quantity_last_update = odoo_stock_quantity_last_update if isinstance(odoo_stock_quantity_last_update, datetime) else fields.datetime.min
 
-        shorepos_date_modified_gmt = datetime.fromisoformat(shorepos_stock_info['time_modified'])
-        shorepos_date_modified_gmt = shorepos_date_modified_gmt.astimezone(UTC).replace(tzinfo=None) if isinstance(shorepos_date_modified_gmt, datetime) else fields.datetime.min
+        try:
+            shorepos_date_modified_gmt = datetime.fromisoformat(shorepos_stock_info['time_modified']).astimezone(UTC).replace(tzinfo=None)
+        except (KeyError, TypeError, ValueError):
+            shorepos_date_modified_gmt = fields.datetime.min
 
-        woocommerce_last_sync = getattr(odoo_product, 'woocommerce_last_sync', None)
-        woocommerce_last_sync = woocommerce_last_sync if isinstance(woocommerce_last_sync, datetime) else fields.datetime.min
+        # Only set if the Odoo-WooCommerce Sync add-on is installed
+        woocommerce_last_sync = getattr(odoo_product, 'woocommerce_last_sync', None) or fields.datetime.min
 
         # Determine the latest timestamp among all sources
         latest_timestamp = max(odoo_stock_quantity_last_update, shorepos_date_modified_gmt, woocommerce_last_sync)
@@ -549,18 +998,18 @@ class ShoreposConnector(models.Model):
         # If Shore POS is the most recent source of truth, update Odoo
         if latest_timestamp == shorepos_date_modified_gmt:
             if odoo_product_stock_quant:
-                odoo_product_stock_quant.with_context(from_external_sync=True).with_company(self.env.company).write({'quantity': shorepos_stock_quantity})
+                odoo_stock_quants_to_write.setdefault(shorepos_stock_quantity, []).append(odoo_product_stock_quant.id)
                 _logger.info(
                     f'Updated Shore POS product stock quantity in Odoo: {odoo_product.name} (Odoo product ID: {odoo_product.id}, Shore POS product ID: {product_shorepos_id}) - Stock quantity: {shorepos_stock_quantity}'
                 )
 
             else:
-                self.env['stock.quant'].create(
+                odoo_stock_quants_to_create.append(
                     {
-                        'shorepos_store_identifier': self.settings_shorepos_store_identifier,
+                        'shorepos_store_identifier': store_id,
                         'product_id': odoo_product.id,
                         'quantity': shorepos_stock_quantity,
-                        'location_id': self.settings_shorepos_products_warehouse_location.lot_stock_id.id,
+                        'location_id': location_id,
                     }
                 )
                 _logger.info(
@@ -568,7 +1017,7 @@ class ShoreposConnector(models.Model):
                 )
 
             # Update the stock last sync
-            odoo_product.shorepos_stock_last_sync_update(shorepos_date_modified_gmt)
+            odoo_stock_last_sync_timestamps[odoo_product.id] = shorepos_date_modified_gmt
 
         # If Odoo is the most recent source, update Shore POS
         else:
@@ -579,8 +1028,28 @@ class ShoreposConnector(models.Model):
                 }
             }
 
-            # The Shore POS endpoint 'products/{product_shorepos_id}/adjust_inventory' does not provide the 'time_modified field' on API Version 13
-            response = self.shorepos_api_request(method='put', endpoint=f'products/{product_shorepos_id}/adjust_inventory', json=stock_payload)
+            shorepos_stock_adjustments_to_push.append((odoo_product, product_shorepos_id, stock_payload))
+
+    def shorepos_stock_adjustments_push(self: models.Model, shorepos_stock_adjustments: list[tuple[models.Model, int, dict[str, Any]]]) -> dict[int, int]:
+        """Pushes Odoo stock quantities to Shore POS, issuing the 'adjust_inventory' requests in parallel. Returns the Shore POS product IDs of the updated products, keyed by Odoo product ID."""
+
+        self.ensure_one()
+
+        # Store Shore POS product ID in a list after Odoo data has been pushed to Shore POS
+        shorepos_product_ids_updated = {}
+
+        if not shorepos_stock_adjustments:
+            return shorepos_product_ids_updated
+
+        # The Shore POS endpoint 'products/{product_shorepos_id}/adjust_inventory' does not provide the 'time_modified field' on API Version 13
+        responses = self.shorepos_api_requests_parallel(
+            method='put',
+            requests_kwargs=[{'endpoint': f'products/{product_shorepos_id}/adjust_inventory', 'json': stock_payload} for _odoo_product, product_shorepos_id, stock_payload in shorepos_stock_adjustments],
+        )
+
+        for (odoo_product, product_shorepos_id, _stock_payload), response in zip(shorepos_stock_adjustments, responses, strict=True):
+            if isinstance(response, Exception):
+                raise response
 
             _logger.info(
                 f'Updated Odoo product stock quantity in Shore POS: {odoo_product.name} (Odoo product ID: {odoo_product.id}, Shore POS product ID: {product_shorepos_id}) - Stock quantity: {odoo_product.qty_available}. Shore POS response: {response}'
@@ -591,7 +1060,43 @@ class ShoreposConnector(models.Model):
 
         return shorepos_product_ids_updated
 
-    def odoo_shorepos_products_stock_quantity_sync_batch(self: models.Model) -> None:
+    def shorepos_products_fetch(self: models.Model, shorepos_product_ids: set[int]) -> dict[int, dict[str, Any]]:
+        """Fetches the given Shore POS products, issuing the 'products/{shorepos_id}' requests in parallel. Returns the Shore POS products retrieved, keyed by Shore POS product ID."""
+
+        self.ensure_one()
+
+        shorepos_products_map = {}
+
+        if not shorepos_product_ids:
+            return shorepos_products_map
+
+        shorepos_product_ids = list(shorepos_product_ids)
+        responses = self.shorepos_api_requests_parallel(method='get', requests_kwargs=[{'endpoint': f'products/{shorepos_id}'} for shorepos_id in shorepos_product_ids])
+
+        for shorepos_id, response in zip(shorepos_product_ids, responses, strict=True):
+            if isinstance(response, HTTPError):
+                _logger.warning(f'Failed to retrieve updated Shore POS product: Shore POS product ID {shorepos_id}: {response}')
+
+            elif isinstance(response, Exception):
+                raise response
+
+            else:
+                shorepos_products_map[shorepos_id] = response
+
+        return shorepos_products_map
+
+    def odoo_stock_quants_apply(self: models.Model, odoo_stock_quants_to_write: dict[float, list[int]], odoo_stock_quants_to_create: list[dict[str, Any]]) -> None:
+        """Applies Shore POS stock quantities to Odoo with a single write per distinct quantity and a single create for the missing stock quants."""
+
+        self.ensure_one()
+
+        for stock_quantity, odoo_stock_quant_ids in odoo_stock_quants_to_write.items():
+            self.env['stock.quant'].browse(odoo_stock_quant_ids).with_context(from_external_sync=True).with_company(self.env.company).write({'quantity': stock_quantity})
+
+        if odoo_stock_quants_to_create:
+            self.env['stock.quant'].create(odoo_stock_quants_to_create)
+
+    def odoo_shorepos_products_stock_quantity_sync_batch(self: models.Model, batch_size: int = SHOREPOS_STOCK_SYNC_BATCH_SIZE) -> None:
         """Synchronize stock quantity levels between Shore POS and Odoo using 'product.product records'. In Shore POS, if a stock quantity level changes due to a purchase, the 'time_modified' field is updated accordingly."""
 
         self.ensure_one()
@@ -601,102 +1106,271 @@ class ShoreposConnector(models.Model):
 
         # Retrieve last sync timestamp from the log model
         if self.settings_shorepos_modified_records_import:
-            shorepos_stock_sync_log = self.env['shorepos.stock.sync.log'].search([], limit=1)
+            shorepos_stock_sync_log = self.sync_log_get('shorepos.stock.sync.log')
             if shorepos_stock_sync_log:
                 params['start_date'] = (
                     f'{shorepos_stock_sync_log.odoo_shorepos_last_sync.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]}Z'  # Has no effect on the "products" endpoint; Only supported by the "products/delta/modified" endpoint, which is unreliable with API version 13
                 )
 
-        # Fetch all products from Shore POS
-        shorepos_products = self.shorepos_api_request_all(method='get', endpoint='products', params=params)
-        shorepos_products_map = {shorepos_product['id']: shorepos_product for shorepos_product in shorepos_products}
+        # Odoo stock location and Shore POS store identifier
+        location_id = self.settings_shorepos_products_warehouse_location.lot_stock_id.id
+        store_id = self.settings_shorepos_store_identifier
 
         # Fetch all Odoo 'product.product' records linked to Shore POS
-        if version_info[0] == 16:
-            odoo_products = self.env['product.product'].search(
-                [
-                    ('product_tmpl_id.shorepos_store_identifier', '=', self.settings_shorepos_store_identifier),
-                    ('product_tmpl_id.sync_to_shorepos', '=', True),
-                    ('product_tmpl_id.active', '=', True),
-                    ('product_tmpl_id.shorepos_id', '!=', False),
-                    ('detailed_type', '=', 'product'),
-                ]
-            )
+        odoo_products = self.env['product.product'].search(
+            [
+                ('product_tmpl_id.shorepos_store_identifier', '=', store_id),
+                ('product_tmpl_id.sync_to_shorepos', '=', True),
+                ('product_tmpl_id.active', '=', True),
+                ('product_tmpl_id.shorepos_id', '!=', False),
+                ODOO_PRODUCT_STORABLE_CONDITION,
+            ]
+        )
+
+        # Shore POS product IDs of these Odoo products
+        odoo_products.mapped('shorepos_id')
+        odoo_products.mapped('product_tmpl_id.shorepos_id')
+        shorepos_product_ids_map = {odoo_product.id: int(odoo_product.shorepos_id) or int(odoo_product.product_tmpl_id.shorepos_id) for odoo_product in odoo_products}
+        shorepos_product_ids = set(shorepos_product_ids_map.values())
+
+        # Fetch from Shore POS only the products linked to these Odoo products
+        shorepos_products = self.shorepos_api_request_all(method='get', endpoint='products', params=params, filter_fn=lambda shorepos_product: shorepos_product['id'] in shorepos_product_ids)
+        shorepos_products_map = {shorepos_product['id']: shorepos_product for shorepos_product in shorepos_products}
+
+        shorepos_product_ids_updated = {}
+
+        # Sync the products in batches, committing after each batch so that a failure does not roll back the batches already synced to Shore POS
 
-        elif version_info[0] == 18:
-            odoo_products = self.env['product.product'].search(
+        for batch_start in range(0, len(odoo_products), batch_size):
+            odoo_products_batch = odoo_products[batch_start : batch_start + batch_size]
+
+            # Prefill the ORM cache for the fields read while syncing ('qty_available' is computed for the whole batch at once)
+            odoo_products_batch.read(['qty_available', 'shorepos_id', 'name'] + (['woocommerce_last_sync'] if 'woocommerce_last_sync' in odoo_products_batch._fields else []))
+            odoo_products_batch.mapped('product_tmpl_id.shorepos_id')
+
+            # Fetch all Odoo stock quants of these products at once
+            odoo_stock_quants = self.env['stock.quant'].search(
                 [
-                    ('product_tmpl_id.shorepos_store_identifier', '=', self.settings_shorepos_store_identifier),
-                    ('product_tmpl_id.sync_to_shorepos', '=', True),
-                    ('product_tmpl_id.active', '=', True),
-                    ('product_tmpl_id.shorepos_id', '!=', False),
-                    ('is_storable', '=', True),
+                    ('product_tmpl_id.shorepos_store_identifier', '=', store_id),
+                    ('product_id', 'in', odoo_products_batch.ids),
+                    ('location_id', '=', location_id),
                 ]
             )
+            odoo_stock_quants_map = {}
+            for odoo_stock_quant in odoo_stock_quants:
+                odoo_stock_quants_map.setdefault(odoo_stock_quant.product_id.id, odoo_stock_quant)
+
+            # Odoo stock quant changes and Shore POS stock adjustments, applied in bulk once all products of the batch have been compared
+            odoo_stock_quants_to_write = {}
+            odoo_stock_quants_to_create = []
+            shorepos_stock_adjustments_to_push = []
+            odoo_stock_last_sync_timestamps = {}
+
+            for odoo_product in odoo_products_batch:
+                self.odoo_shorepos_products_stock_quantity_sync(
+                    odoo_product=odoo_product,
+                    product_shorepos_id=shorepos_product_ids_map[odoo_product.id],
+                    shorepos_products_stock_map=shorepos_products_map,
+                    odoo_stock_quants_map=odoo_stock_quants_map,
+                    location_id=location_id,
+                    store_id=store_id,
+                    odoo_stock_quants_to_write=odoo_stock_quants_to_write,
+                    odoo_stock_quants_to_create=odoo_stock_quants_to_create,
+                    odoo_stock_last_sync_timestamps=odoo_stock_last_sync_timestamps,
+                    shorepos_stock_adjustments_to_push=shorepos_stock_adjustments_to_push,
+                )
 
-        shorepos_product_ids_updated = {}
+            self.odoo_stock_quants_apply(odoo_stock_quants_to_write, odoo_stock_quants_to_create)
+            self.env['product.product'].shorepos_stock_last_sync_update_batch(odoo_stock_last_sync_timestamps)
+            shorepos_product_ids_updated.update(self.shorepos_stock_adjustments_push(shorepos_stock_adjustments_to_push))
 
-        for odoo_product in odoo_products:
-            shorepos_product_ids_updated.update(self.odoo_shorepos_products_stock_quantity_sync(odoo_product, shorepos_products_map))
+            if batch_start + batch_size < len(odoo_products):
+                self.env.cr.commit()
 
         # After all syncs, fetch timestamps for all Shore POS products whose stock was updated from Odoo
         if shorepos_product_ids_updated:
-            # Fetch all products again to get the updated 'time_modified'
-            shorepos_products = self.shorepos_api_request_all(method='get', endpoint='products')
-            shorepos_products_map = {shorepos_product['id']: shorepos_product for shorepos_product in shorepos_products}
+            # Fetch only the updated products again to get the updated 'time_modified'
+            shorepos_products_map = self.shorepos_products_fetch(set(shorepos_product_ids_updated.values()))
 
+            odoo_stock_last_sync_timestamps = {}
             for odoo_product in odoo_products:
                 shorepos_id = shorepos_product_ids_updated.get(odoo_product.id)
                 if shorepos_id and shorepos_id in shorepos_products_map:
                     shorepos_product_data = shorepos_products_map[shorepos_id]
-
-                    # Update the stock last sync
-                    odoo_product.shorepos_stock_last_sync_update(datetime.fromisoformat(shorepos_product_data['time_modified']).astimezone(UTC).replace(tzinfo=None))
+                    odoo_stock_last_sync_timestamps[odoo_product.id] = datetime.fromisoformat(shorepos_product_data['time_modified']).astimezone(UTC).replace(tzinfo=None)
                     _logger.info(f'Updated Shore POS product sync timestamp into Odoo: {odoo_product.name} (Odoo product ID: {odoo_product.id}, Shore POS ID: {shorepos_id})')
 
+            # Update the stock last sync of all products at once
+            self.env['product.product'].shorepos_stock_last_sync_update_batch(odoo_stock_last_sync_timestamps)
+
     @api.model
     def odoo_to_shorepos_products_delete(self: models.Model) -> None:
         # Odoo search conditions
-        search_conditions = [('shorepos_store_identifier', '=', self.settings_shorepos_store_identifier), ('sync_to_shorepos', '=', False), ('shorepos_id', '!=', False)]
+        search_conditions = list(_shorepos_sync_domain(self.settings_shorepos_store_identifier, None, 'delete'))
 
         # Odoo products
         odoo_products = self.env['product.template'].search(search_conditions)
 
-        for odoo_product in odoo_products:
-            try:
-                self.shorepos_api_request(method='delete', endpoint=f'products/{odoo_product.shorepos_id}')
+        if not odoo_products:
+            return None
+
+        # Odoo products deleted (or already missing) in Shore POS
+        odoo_products_deleted_ids = []
 
+        responses = self.shorepos_api_requests_parallel(method='delete', requests_kwargs=[{'endpoint': f'products/{odoo_product.shorepos_id}'} for odoo_product in odoo_products])
+
+        for odoo_product, response in zip(odoo_products, responses, strict=True):
+            if not isinstance(response, Exception):
                 # If deletion is successful, clear the Shore POS fields in Odoo
-                odoo_product.write({'shorepos_store_identifier': False, 'shorepos_id': False, 'odoo_to_shorepos_last_sync': False, 'shorepos_stock_last_sync': False})
+                odoo_products_deleted_ids.append(odoo_product.id)
                 _logger.info(f'Deleted Odoo product from Shore POS: {odoo_product.name} (Odoo product ID: {odoo_product.id})')
 
-            except requests.exceptions.HTTPError as error:
-                if error.response.status_code == 404:
-                    _logger.warning(
-                        f'Not found Odoo product in Shore POS: {odoo_product.name} (Odoo product ID: {odoo_product.id}, Shore POS product ID: {odoo_product["shorepos_id"]}); Clearing Shore POS fields in Odoo'
-                    )
-                    # If it's already gone from Shore POS, just clear the Shore POS fields in Odoo
-                    odoo_product.write({'shorepos_store_identifier': False, 'shorepos_id': False, 'odoo_to_shorepos_last_sync': False, 'shorepos_stock_last_sync': False})
-                else:
-                    _logger.exception(f'HTTPError while deleting Odoo product from Shore POS: {odoo_product.name} (Odoo product ID: {odoo_product.id}, Shore POS product ID: {odoo_product["shorepos_id"]}): {error}')
-            except Exception as error:
-                _logger.exception(f'Error while deleting Odoo product from Shore POS: {odoo_product.name} (Odoo product ID: {odoo_product.id}, Shore POS product ID: {odoo_product["shorepos_id"]}): {error}')
+            elif isinstance(response, requests.exceptions.HTTPError) and response.response is not None and response.response.status_code == 404:
+                _logger.warning(
+                    f'Not found Odoo product in Shore POS: {odoo_product.name} (Odoo product ID: {odoo_product.id}, Shore POS product ID: {odoo_product["shorepos_id"]}); Clearing Shore POS fields in Odoo'
+                )
+                # If it's already gone from Shore POS, just clear the Shore POS fields in Odoo
+                odoo_products_deleted_ids.append(odoo_product.id)
+
+            elif isinstance(response, requests.exceptions.HTTPError):
+                _logger.error(f'HTTPError while deleting Odoo product from Shore POS: {odoo_product.name} (Odoo product ID: {odoo_product.id}, Shore POS product ID: {odoo_product["shorepos_id"]}): {response}', exc_info=response)
+
+            else:
+                _logger.error(f'Error while deleting Odoo product from Shore POS: {odoo_product.name} (Odoo product ID: {odoo_product.id}, Shore POS product ID: {odoo_product["shorepos_id"]}): {response}', exc_info=response)
+
+        # Clear the Shore POS fields of all deleted products at once
+        if odoo_products_deleted_ids:
+            self.env['product.template'].browse(odoo_products_deleted_ids).write({'shorepos_store_identifier': False, 'shorepos_id': False, 'odoo_to_shorepos_last_sync': False, 'shorepos_stock_last_sync': False})
 
     @api.model
-    def odoo_to_shorepos_products_sync(self: models.Model) -> None:
+    def odoo_to_shorepos_products_modified_filter(self: models.Model, odoo_product_ids: list[int]) -> list[int]:
+        """Returns the IDs of the 'product.template' records modified since their last sync to Shore POS, or never synced (compared in the database, as the ORM does not support comparing two columns)."""
+
+        if not odoo_product_ids:
+            return []
+
+        self.env['product.template'].flush_model(['odoo_to_shorepos_last_sync', 'write_date'])
+        self.env.cr.execute(
+            query='SELECT id FROM product_template WHERE id = ANY(%s) AND (odoo_to_shorepos_last_sync IS NULL OR odoo_to_shorepos_last_sync < write_date) ORDER BY id',
+            params=(list(odoo_product_ids),),
+        )
+
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    def odoo_to_shorepos_products_to_sync_get(self: models.Model) -> list[int]:
+        """Returns the IDs of the 'product.template' records to sync to Shore POS, skipping the ones already waiting in (or being synced by) a products sync queue job, which would otherwise be created twice in Shore POS."""
+
+        self.ensure_one()
+
         # Odoo search conditions
-        search_conditions = [('sync_to_shorepos', '=', True), ('active', '=', True), ('default_code', '!=', False)]
+        search_conditions = list(_shorepos_sync_domain(self.settings_shorepos_store_identifier, self.settings_shorepos_odoo_to_shorepos_products_language_code, 'sync'))
 
-        if self.settings_shorepos_odoo_to_shorepos_products_language_code:
-            search_conditions.append(('product_language_code', '=', self.settings_shorepos_odoo_to_shorepos_products_language_code))
+        # Odoo products (products whose variants match the search conditions are a subset of these, as the product itself must have a 'default_code' and the variants of an archived product are archived as well)
+        odoo_product_ids = self.odoo_to_shorepos_products_modified_filter(self.env['product.template'].search(search_conditions).ids)
 
-        # Odoo products
-        odoo_products = self.env['product.template'].search(search_conditions) | self.env['product.product'].search(search_conditions + [('product_tmpl_id.default_code', '!=', False)]).mapped('product_tmpl_id')
+        if not odoo_product_ids:
+            return []
 
-        # Sync if modified or never synced
-        odoo_products_to_sync = odoo_products.filtered(lambda odoo_product: (not odoo_product.odoo_to_shorepos_last_sync or odoo_product.odoo_to_shorepos_last_sync < odoo_product['write_date']))
+        # Odoo products queued for sync by a previous sync run
+        queue_jobs_undone = self.queue_jobs_get(QUEUE_JOB_STATES_UNDONE, method_name='odoo_to_shorepos_products_sync_batch')
+        odoo_product_ids_queued = {odoo_product_id for queue_job in queue_jobs_undone if queue_job.args for odoo_product_id in queue_job.args[0]}
 
-        for odoo_product in odoo_products_to_sync:
+        return [odoo_product_id for odoo_product_id in odoo_product_ids if odoo_product_id not in odoo_product_ids_queued]
+
+    def odoo_product_price_excluded_get(self: models.Model, odoo_product: models.Model, odoo_prices_excluded_cache: dict[tuple[Any, ...], float]) -> float:
+        """Returns the price excluding taxes of an Odoo product or product variant, computing the taxes only once per distinct taxes, list price and currency (and product, if any tax may depend on it)."""
+
+        self.ensure_one()
+
+        key = (tuple(odoo_product.taxes_id.ids), odoo_product.list_price, odoo_product.currency_id.id)
+
+        # Taxes other than plain percentage, division or fixed taxes (e.g. Python code or group taxes) may depend on the product
+        if any(tax.amount_type not in ('percent', 'division', 'fixed') for tax in odoo_product.taxes_id):
+            key += (odoo_product._name, odoo_product.id)
+
+        if key not in odoo_prices_excluded_cache:
+            odoo_prices_excluded_cache[key] = float(
+                odoo_product.taxes_id.compute_all(
+                    price_unit=odoo_product.list_price,
+                    currency=odoo_product.currency_id,
+                    quantity=1.0,
+                    product=odoo_product,
+                    partner=self.env['res.partner'],
+                    is_refund=False,
+                    handle_price_include=True,
+                    include_caba_tags=False,
+                    rounding_method=None,
+                )['total_excluded']
+            )
+
+        return odoo_prices_excluded_cache[key]
+
+    def odoo_to_shorepos_products_sync_batch(self: models.Model, odoo_product_ids: list[int]) -> None:
+        """Synchronizes a batch of Odoo 'product.template' records to Shore POS. If the Shore POS rate limit is hit, the products synced so far are committed and the job is retried for the remaining products."""
+
+        self.ensure_one()
+
+        # Skip the products synced meanwhile (e.g. by a previous attempt of this job, which hit the Shore POS rate limit) or not to be synced anymore (e.g. archived since the job was queued)
+        odoo_products_to_sync = (
+            self.env['product.template']
+            .browse(self.odoo_to_shorepos_products_modified_filter(odoo_product_ids))
+            .filtered_domain(list(_shorepos_sync_domain(self.settings_shorepos_store_identifier, self.settings_shorepos_odoo_to_shorepos_products_language_code, 'sync')))
+        )
+
+        # Prefetch the fields of all products and variants to sync in batch, instead of once per product
+        odoo_product_variants_to_sync = odoo_products_to_sync.mapped('product_variant_ids')
+        odoo_product_fields_prefetch = ['qty_available', 'reordering_min_qty', 'reordering_max_qty', 'standard_price', 'currency_id', 'taxes_id.amount', 'uom_id.name', 'packaging_ids.qty', 'seller_ids']
+
+        for field_path in odoo_product_fields_prefetch + ['categ_id.name', 'attribute_line_ids.attribute_id.name', 'attribute_line_ids.value_ids.name']:
+            odoo_products_to_sync.mapped(field_path)
+
+        for field_path in odoo_product_fields_prefetch + ['product_template_attribute_value_ids.attribute_id.name']:
+            odoo_product_variants_to_sync.mapped(field_path)
+
+        # Fields of optional add-ons ('product_multi_category' and 'product_brand')
+        for field_name, field_path in (('categ_ids', 'categ_ids.name'), ('product_brand_id', 'product_brand_id.name')):
+            if field_name in odoo_products_to_sync._fields:
+                odoo_products_to_sync.mapped(field_path)
+
+        # Prices excluding taxes, shared by the products and variants with identical taxes, list price and currency
+        odoo_prices_excluded_cache = {}
+
+        # Shore POS category IDs, keyed by Odoo category ID, as categories are shared by many products (failed lookups are not cached, so they are retried)
+        shorepos_category_ids_cache = {}
+
+        def shorepos_category_id_get(category):
+            category_id = shorepos_category_ids_cache.get(category.id) or self.shorepos_category_create_or_retrieve(category)
+            if category_id:
+                shorepos_category_ids_cache[category.id] = category_id
+
+            return category_id
+
+        # Shore POS product IDs of the synced products, stored by one SQL update at the end of the batch (or before a rate-limit retry) instead of once per product
+        shorepos_product_ids_to_update = {}
+
+        def shorepos_product_ids_update():
+            self.env['product.template'].shorepos_link_update(shorepos_product_ids_to_update, self.settings_shorepos_store_identifier, fields.Datetime.now())
+            shorepos_product_ids_to_update.clear()
+
+        # Package size of the products and variants, depending on the default package size unit setting
+        package_size_unit_default = self.settings_shorepos_products_package_size_unit_default
+
+        def package_size_value_get(odoo_product):
+            if odoo_product.packaging_ids:
+                return float(odoo_product.packaging_ids[0].qty)
+
+            return 1 if (odoo_product.uom_id and odoo_product.uom_id.name == 'Units') or package_size_unit_default == 'pc' else None
+
+        def package_size_unit_get(uom):
+            if uom and uom.name == 'Units':
+                return 'pc'
+
+            if package_size_unit_default != 'odoo':
+                return package_size_unit_default
+
+            return uom.name.lower() if uom and uom.name.lower() in SHOREPOS_PACKAGE_SIZE_UNITS else None
+
+        for index, odoo_product in enumerate(odoo_products_to_sync):
             try:
                 if odoo_product.default_code and len(odoo_product.default_code) > 30:
                     _logger.info(
@@ -707,9 +1381,12 @@ class ShoreposConnector(models.Model):
                 # Determine categories: check for multi-category field, otherwise use default category
                 categories = []
                 if hasattr(odoo_product, 'categ_ids') and odoo_product.categ_ids:
-                    categories = [{'id': self.shorepos_category_create_or_retrieve(category)} for category in odoo_product.categ_ids if self.shorepos_category_create_or_retrieve(category)]
+                    for category in odoo_product.categ_ids:
+                        category_id = shorepos_category_id_get(category)
+                        if category_id:
+                            categories.append({'id': category_id})
                 elif odoo_product.categ_id:
-                    category_id = self.shorepos_category_create_or_retrieve(odoo_product.categ_id)
+                    category_id = shorepos_category_id_get(odoo_product.categ_id)
                     if category_id:
                         categories.append({'id': category_id})
 
@@ -725,19 +1402,7 @@ class ShoreposConnector(models.Model):
                     'product_code': odoo_product.default_code or '',
                     'ean': odoo_product.default_code or '',
                     'gtin': odoo_product.default_code or '',
-                    'price': float(
-                        odoo_product.taxes_id.compute_all(
-                            price_unit=odoo_product.list_price,
-                            currency=odoo_product.currency_id,
-                            quantity=1.0,
-                            product=odoo_product,
-                            partner=self.env['res.partner'],
-                            is_refund=False,
-                            handle_price_include=True,
-                            include_caba_tags=False,
-                            rounding_method=None,
-                        )['total_excluded']
-                    ),
+                    'price': self.odoo_product_price_excluded_get(odoo_product, odoo_prices_excluded_cache),
                     'purchase_price': float(odoo_product.standard_price),
                     'custom_price': False,
                     'tax_type': self.shorepos_tax_rate_create_or_retrieve(odoo_product.taxes_id[0].amount) if odoo_product.taxes_id else None,
@@ -745,20 +1410,8 @@ class ShoreposConnector(models.Model):
                     'attributes': {},
                     'categories': categories or None,
                     'images': [{'id': shorepos_image_id, 'new': True}] if shorepos_image_id else None,
-                    'package_size_value': (
-                        float(odoo_product.packaging_ids[0].qty)
-                        if odoo_product.packaging_ids
-                        else 1
-                        if (odoo_product.uom_id and odoo_product.uom_id.name == 'Units') or self.settings_shorepos_products_package_size_unit_default == 'pc'
-                        else None
-                    ),
-                    'package_size_unit': (
-                        'pc'
-                        if odoo_product.uom_id and odoo_product.uom_id.name == 'Units'
-                        else (odoo_product.uom_id.name.lower() if odoo_product.uom_id and odoo_product.uom_id.name.lower() in ['ml', 'l', 'g', 'kg', 'm', 'm2', 'm3', 'pc'] else None)
-                        if self.settings_shorepos_products_package_size_unit_default == 'odoo'
-                        else self.settings_shorepos_products_package_size_unit_default
-                    ),
+                    'package_size_value': package_size_value_get(odoo_product),
+                    'package_size_unit': package_size_unit_get(odoo_product.uom_id),
                     'brand': odoo_product.product_brand_id.name if odoo_product.product_brand_id else None,
                     'supplier': odoo_product.seller_ids[0].name.name if odoo_product.seller_ids else None,
                     'reorder_level': float(odoo_product.reordering_min_qty),
@@ -786,38 +1439,14 @@ class ShoreposConnector(models.Model):
                             'product_code': odoo_product_variant.default_code or '',
                             'ean': odoo_product_variant.default_code or '',
                             'gtin': odoo_product_variant.default_code or '',
-                            'price': float(
-                                odoo_product_variant.taxes_id.compute_all(
-                                    price_unit=odoo_product_variant.list_price,
-                                    currency=odoo_product_variant.currency_id,
-                                    quantity=1.0,
-                                    product=odoo_product_variant,
-                                    partner=self.env['res.partner'],
-                                    is_refund=False,
-                                    handle_price_include=True,
-                                    include_caba_tags=False,
-                                    rounding_method=None,
-                                )['total_excluded']
-                            ),
+                            'price': self.odoo_product_price_excluded_get(odoo_product_variant, odoo_prices_excluded_cache),
                             'purchase_price': float(odoo_product_variant.standard_price),
                             'tax_type': self.shorepos_tax_rate_create_or_retrieve(odoo_product_variant.taxes_id[0].amount) if odoo_product_variant.taxes_id else None,
                             'quantity': float(odoo_product_variant.qty_available),
                             'attributes': variant_attributes,
                             'images': [{'id': shorepos_image_id, 'new': True}] if shorepos_image_id else None,
-                            'package_size_value': (
-                                float(odoo_product_variant.packaging_ids[0].qty)
-                                if odoo_product_variant.packaging_ids
-                                else 1
-                                if (odoo_product_variant.uom_id and odoo_product_variant.uom_id.name == 'Units') or self.settings_shorepos_products_package_size_unit_default == 'pc'
-                                else None
-                            ),
-                            'package_size_unit': (
-                                'pc'
-                                if odoo_product_variant.uom_id and odoo_product_variant.uom_id.name == 'Units'
-                                else (odoo_product_variant.uom_id.name.lower() if odoo_product_variant.uom_id and odoo_product_variant.uom_id.name.lower() in ['ml', 'l', 'g', 'kg', 'm', 'm2', 'm3', 'pc'] else None)
-                                if self.settings_shorepos_products_package_size_unit_default == 'odoo'
-                                else self.settings_shorepos_products_package_size_unit_default
-                            ),
+                            'package_size_value': package_size_value_get(odoo_product_variant),
+                            'package_size_unit': package_size_unit_get(odoo_product_variant.uom_id),
                             'reorder_level': float(odoo_product_variant.reordering_min_qty),
                             'safety_stock': float(odoo_product_variant.reordering_max_qty),
                             'is_giftcard': False,
@@ -851,24 +1480,33 @@ class ShoreposConnector(models.Model):
                     response = self.shorepos_api_request(method='post', endpoint='products', json=product_values)
                     _logger.info(f'Imported Odoo product into Shore POS: {odoo_product.name} (Odoo product ID: {odoo_product.id}, Shore POS product ID: {response.get("id")}). Shore POS response: {response}')
 
-                odoo_product.write(
-                    {
-                        'shorepos_store_identifier': self.settings_shorepos_store_identifier,
-                        'shorepos_id': response.get('id'),
-                        'odoo_to_shorepos_last_sync': fields.Datetime.now(),
-                    }
-                )
+                shorepos_product_ids_to_update[odoo_product.id] = response.get('id')
 
                 # Handle variant IDs for newly created variable products
                 if len(odoo_product.product_variant_ids) > 1:
-                    shorepos_variants = {variation.get('product_code'): variation for variation in response.get('variations', [])}
-                    for odoo_product_variant in odoo_product.product_variant_ids:
-                        shorepos_variant = shorepos_variants.get(odoo_product_variant.default_code)
-                        if shorepos_variant and shorepos_variant.get('id'):
-                            odoo_product_variant.write({'shorepos_store_identifier': self.settings_shorepos_store_identifier, 'shorepos_id': shorepos_variant['id'], 'odoo_to_shorepos_last_sync': fields.Datetime.now()})
+                    shorepos_variants = {variation['product_code']: variation['id'] for variation in response.get('variations', []) if variation.get('product_code') and variation.get('id')}
+                    shorepos_variant_ids = {
+                        odoo_product_variant['id']: shorepos_variants[odoo_product_variant['default_code']]
+                        for odoo_product_variant in odoo_product.product_variant_ids.read(['default_code'])
+                        if odoo_product_variant['default_code'] in shorepos_variants
+                    }
+
+                    # Update all variants at once
+                    self.env['product.product'].shorepos_link_update(shorepos_variant_ids, self.settings_shorepos_store_identifier, fields.Datetime.now())
 
             except requests.exceptions.HTTPError as error:
+                if _shorepos_rate_limited(error):
+                    retry_after = int(error.response.headers.get('Retry-After', 1))
+                    _logger.warning(f'Rate limit hit, retrying the sync of {len(odoo_products_to_sync) - index} products after {retry_after}s...')
+
+                    # Keep the products synced so far, which are skipped on retry; the job is retried in place, so that the jobs depending on it still wait for all products to be synced
+                    shorepos_product_ids_update()
+                    self.env.cr.commit()
+                    raise RetryableJobError(f'Shore POS rate limit hit, retrying after {retry_after}s', seconds=retry_after, ignore_retry=True) from error
+
                 _logger.exception(f'HTTPError syncing product {odoo_product.id} to Shore POS: {error}')
 
             except Exception as error:
                 _logger.exception(f'Error syncing product {odoo_product.id} to Shore POS: {error}')
+
+        shorepos_product_ids_update()
@@ -1,7 +1,27 @@
 from datetime import datetime
 from typing import Any
 
-from odoo import fields, models
+from odoo import api, fields, models
+
+
+def _shorepos_link_update(model: models.Model, shorepos_ids: dict[int, Any], store_identifier: str, timestamp: datetime) -> None:
+    """Links many records to their Shore POS IDs with a single UPDATE statement, instead of one ORM write per record."""
+
+    if not shorepos_ids:
+        return
+
+    field_names = ['shorepos_id', 'shorepos_store_identifier', 'odoo_to_shorepos_last_sync']
+
+    # Flush pending ORM updates of these fields, which would otherwise overwrite the update
+    model.flush_model(field_names)
+
+    model.env.cr.execute(
+        query=f'UPDATE {model._table} AS target SET shorepos_id = data.shorepos_id, shorepos_store_identifier = %s, odoo_to_shorepos_last_sync = %s FROM (VALUES {", ".join(["(%s, %s)"] * len(shorepos_ids))}) AS data(id, shorepos_id) WHERE target.id = data.id',
+        params=(store_identifier, timestamp, *(value for record_id, shorepos_id in shorepos_ids.items() for value in (record_id, str(shorepos_id) if shorepos_id else None))),
+    )
+
+    # Invalidate the cache for the modified records to ensure consistency
+    model.browse(list(shorepos_ids)).invalidate_recordset(field_names)
 
 
 # Stock
@@ -17,8 +37,10 @@ class StockQuant(models.Model):
 
     def write(self: models.Model, values: dict[str, Any]) -> bool:
         """Overrides the standard write method to update a timestamp only when the stock quantity is changed manually by a user."""
-        if 'quantity' in values and not self.env.context.get('from_stock_move') and not self.env.context.get('from_external_sync'):
-            values['stock_quantity_last_update'] = fields.Datetime.now()
+        if 'quantity' in values:
+            context = self.env.context
+            if not (context.get('from_stock_move') or context.get('from_external_sync')):
+                values['stock_quantity_last_update'] = fields.Datetime.now()
 
         return super().write(values)
 
@@ -38,6 +60,26 @@ class ProductTemplate(models.Model):
 
     shorepos_stock_last_sync = fields.Datetime(string='Stock Date Updated', readonly=True)
 
+    def init(self: models.Model) -> None:
+        """Creates the partial indexes matching the search conditions of the Shore POS products delete and sync."""
+
+        super().init()
+
+        # Products to delete from Shore POS
+        self.env.cr.execute(
+            query='CREATE INDEX IF NOT EXISTS product_template_shorepos_delete_index ON product_template (shorepos_store_identifier, sync_to_shorepos) WHERE shorepos_id IS NOT NULL',
+        )
+
+        # Products to sync to Shore POS
+        self.env.cr.execute(
+            query='CREATE INDEX IF NOT EXISTS product_template_shorepos_sync_index ON product_template (id) WHERE sync_to_shorepos = TRUE AND active = TRUE AND default_code IS NOT NULL',
+        )
+
+    @api.model
+    def shorepos_link_update(self: models.Model, shorepos_ids: dict[int, Any], store_identifier: str, timestamp: datetime) -> None:
+        """Stores the Shore POS product IDs (keyed by 'product.template' ID) directly via SQL, updating all products at once."""
+        _shorepos_link_update(self, shorepos_ids, store_identifier, timestamp)
+
 
 # Product variations
 class ProductProduct(models.Model):
@@ -50,20 +92,42 @@ class ProductProduct(models.Model):
 
     shorepos_stock_last_sync = fields.Datetime(string='Stock Date Updated', readonly=True)
 
+    @api.model
+    def shorepos_link_update(self: models.Model, shorepos_ids: dict[int, Any], store_identifier: str, timestamp: datetime) -> None:
+        """Stores the Shore POS product variation IDs (keyed by 'product.product' ID) directly via SQL, updating all variations at once."""
+        _shorepos_link_update(self, shorepos_ids, store_identifier, timestamp)
+
     def shorepos_stock_last_sync_update(self: models.Model, timestamp: datetime) -> None:
         """Updates the 'shorepos_stock_last_sync' field for both the product and its template directly via SQL to avoid updating the 'write_date'."""
 
         self.ensure_one()
+        self.shorepos_stock_last_sync_update_batch({self.id: timestamp})
+
+    @api.model
+    def shorepos_stock_last_sync_update_batch(self: models.Model, timestamps: dict[int, datetime]) -> None:
+        """Updates the 'shorepos_stock_last_sync' field of many products (keyed by 'product.product' ID) and their templates directly via SQL, with one UPDATE statement per table."""
+
+        if not timestamps:
+            return
+
+        odoo_products = self.browse(list(timestamps))
 
-        # Update the product.product record using a parameterized query
-        self.env.cr.execute(query='UPDATE product_product SET shorepos_stock_last_sync = %s WHERE id = %s', params=(timestamp, self.id))
+        # Templates get the latest timestamp of their products
+        template_timestamps = {}
+        for odoo_product in odoo_products:
+            template_id = odoo_product.product_tmpl_id.id
+            template_timestamps[template_id] = max(template_timestamps.get(template_id, timestamps[odoo_product.id]), timestamps[odoo_product.id])
 
-        # Update the product.template record using a parameterized query
-        self.env.cr.execute(query='UPDATE product_template SET shorepos_stock_last_sync = %s WHERE id = %s', params=(timestamp, self.product_tmpl_id.id))
+        # Update the product.product and product.template records using parameterized queries
+        for table, table_timestamps in (('product_product', timestamps), ('product_template', template_timestamps)):
+            self.env.cr.execute(
+                query=f'UPDATE {table} AS target SET shorepos_stock_last_sync = data.timestamp FROM (VALUES {", ".join(["(%s, %s::timestamp)"] * len(table_timestamps))}) AS data(id, timestamp) WHERE target.id = data.id',
+                params=tuple(value for record_id, timestamp in table_timestamps.items() for value in (record_id, timestamp)),
+            )
 
         # Invalidate the cache for the modified records to ensure consistency
-        self.env['product.product']._invalidate_cache(ids=[self.id])
-        self.env['product.template']._invalidate_cache(ids=[self.product_tmpl_id.id])
+        odoo_products.invalidate_recordset(['shorepos_stock_last_sync'])
+        self.env['product.template'].browse(list(template_timestamps)).invalidate_recordset(['shorepos_stock_last_sync'])
 
 
 class ShoreposSyncLog(models.Model):
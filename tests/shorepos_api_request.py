@@ -4,13 +4,23 @@
 # Token is valid for 10 hours
 
 # Import packages
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import math
 import os
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 import time
+from urllib3.util.retry import Retry
+
+try:
+    import polars as pl
+    import xlsxwriter
+except ImportError:
+    pl = None
 
 # Settings
 settings_shorepos_api_endpoint_url = 'https://app.inventorum.com/api'
@@ -19,6 +29,14 @@ settings_shorepos_client_secret = ''
 settings_shorepos_refresh_token = ''
 settings_shorepos_access_token = ''
 settings_shorepos_timeout = 30
+settings_shorepos_max_workers = 6
+
+# HTTP session shared by all requests (keeps connections alive)
+session = requests.Session()
+session.headers.update({'Accept': 'application/json'})
+# Retry transient gateway errors of idempotent requests only (the 'adjust_inventory' PUT request applies a stock quantity delta)
+settings_shorepos_retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=frozenset({'GET', 'DELETE'}), raise_on_status=False)
+session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=settings_shorepos_retry))
 
 
 def shorepos_token_get():
@@ -56,66 +74,82 @@ def shorepos_token_get():
 
 def shorepos_api_request(method, endpoint, api_version=None, params=None, data=None, json=None, files=None, timeout=30):
     headers = {
-        'Accept': 'application/json',
         'Authorization': f'Bearer {settings_shorepos_access_token}',
         'X-Api-Version': api_version or '13',
     }
     if (json is not None or data is not None) and not files:
         headers['Content-Type'] = 'application/json'
 
-    response = requests.request(method=method, url=f'{settings_shorepos_api_endpoint_url}/{endpoint}/', headers=headers, params=params, data=data, json=json, files=files, timeout=timeout)
+    response = session.request(method=method, url=f'{settings_shorepos_api_endpoint_url}/{endpoint}/', headers=headers, params=params, data=data, json=json, files=files, timeout=timeout)
     response.raise_for_status()
     return response.json()
 
 
-def shorepos_api_request_all(method, endpoint, api_version=None, params=None, data=None, json=None, files=None, timeout=30):
-    items_all = []
-    page = 1
+def shorepos_api_request_retry(method, endpoint, api_version=None, params=None, data=None, json=None, files=None, timeout=30):
+    while True:
+        try:
+            return shorepos_api_request(method=method, endpoint=endpoint, api_version=api_version, params=params, data=data, json=json, files=files, timeout=timeout)
+
+        except HTTPError as error:
+            if error.response.status_code == 429:
+                retry_after = int(error.response.headers.get('Retry-After', 1))
+                _logger.warning(f'Rate limit hit, retrying after {retry_after}s...')
+                time.sleep(retry_after)
+                continue
+            else:
+                raise
+
+
+def shorepos_response_items(response):
+    if isinstance(response, list):
+        return response
+
+    if isinstance(response, dict):
+        if 'results' in response and isinstance(response['results'], list):
+            return response['results']
+
+        elif 'data' in response:
+            return response['data']
+
+    return None
 
+
+def shorepos_api_request_all(method, endpoint, api_version=None, params=None, data=None, json=None, files=None, timeout=30):
     if params is None:
         params = {}
     params.setdefault('limit', 100)
 
-    while True:
-        try:
-            params['page'] = page
-
-            response = shorepos_api_request(method=method, endpoint=endpoint, api_version=api_version, params=params, data=data, json=json, files=files, timeout=timeout)
+    def page_get(page):
+        return shorepos_api_request_retry(method=method, endpoint=endpoint, api_version=api_version, params={**params, 'page': page}, data=data, json=json, files=files, timeout=timeout)
 
-            if not response:
-                break
+    # First page
+    response = page_get(page=1)
+    items_all = shorepos_response_items(response) or []
 
-            if isinstance(response, list):
-                items_all.extend(response)
-                break
+    if isinstance(response, list) or len(items_all) < params['limit']:
+        return items_all
 
-            if isinstance(response, dict):
-                items = None
+    # Pages 2..n (fetched in parallel if the total number of items is known)
+    if isinstance(response.get('count'), int):
+        with ThreadPoolExecutor(max_workers=settings_shorepos_max_workers) as executor:
+            for items in executor.map(page_get, range(2, math.ceil(response['count'] / params['limit']) + 1)):
+                items_all.extend(shorepos_response_items(items) or [])
 
-                if 'results' in response and isinstance(response['results'], list):
-                    items = response['results']
+        return items_all
 
-                elif 'data' in response:
-                    items = response['data']
+    page = 2
+    while True:
+        items = shorepos_response_items(page_get(page=page))
 
-                if items is not None:
-                    items_all.extend(items)
+        if not items:
+            break
 
-                    if len(items) < params['limit']:
-                        break
+        items_all.extend(items)
 
-                    page += 1
-                    time.sleep(0.05)
-                    continue
+        if len(items) < params['limit']:
+            break
 
-        except HTTPError as error:
-            if error.response.status_code == 429:
-                retry_after = int(error.response.headers.get('Retry-After', 1))
-                _logger.warning(f'Rate limit hit, retrying after {retry_after}s...')
-                time.sleep(retry_after)
-                continue
-            else:
-                raise
+        page += 1
 
     return items_all
 
@@ -138,29 +172,46 @@ shorepos_categories = shorepos_api_request_all(method='get', endpoint='categorie
 tax_lookup = {tax['id']: tax['name'] for tax in shorepos_taxes}
 category_lookup = {category['id']: category['name'] for category in shorepos_categories}
 
-for product in shorepos_products:
-    # Replace tax_type ID with the corresponding name
-    tax_id = product.get('tax_type')
-    if tax_id and tax_id in tax_lookup:
-        product['tax_type'] = tax_lookup[tax_id]
-
-    # Replace category IDs with their names
-    category_ids = product.get('categories', [])
-    if category_ids:
-        product['categories'] = [category_lookup.get(cat_id) for cat_id in category_ids]
-        product['categories'] = [name for name in product['categories'] if name]
-
-
-shorepos_products_df = pd.DataFrame(data=shorepos_products, index=None, dtype='str')
+# Keep the original values (e.g. integer IDs alongside missing values) until the names have been substituted
+shorepos_products_df = pd.DataFrame(data=shorepos_products, index=None, dtype=object)
+
+# Replace tax_type ID with the corresponding name
+if 'tax_type' in shorepos_products_df:
+    shorepos_products_df['tax_type'] = shorepos_products_df['tax_type'].map(tax_lookup).fillna(shorepos_products_df['tax_type'])
+
+# Replace category IDs with their names
+if 'categories' in shorepos_products_df:
+    shorepos_products_df['categories'] = shorepos_products_df['categories'].apply(
+        lambda category_ids: [category_lookup[category_id] for category_id in category_ids if category_lookup.get(category_id)] if isinstance(category_ids, list) else category_ids,
+    )
+
+# Convert to strings, keeping missing values blank in the export
+shorepos_products_df = shorepos_products_df.astype(str).mask(shorepos_products_df.isna())
+
+shorepos_products_path = os.path.join(os.path.expanduser('~'), 'Downloads', 'Shore POS Products.xlsx')
+
+if pl is not None:
+    # Polars always writes the data as an Excel table, which is left unstyled and without filter buttons
+    with xlsxwriter.Workbook(filename=shorepos_products_path, options={'strings_to_formulas': False, 'strings_to_urls': False}) as workbook:
+        pl.from_pandas(data=shorepos_products_df).write_excel(
+            workbook=workbook,
+            worksheet='Shore POS Products',
+            table_style=None,
+            autofilter=False,
+            autofit=False,
+            freeze_panes=(1, 0),
+            include_header=True,
+        )
 
-with pd.ExcelWriter(
-    path=os.path.join(os.path.expanduser('~'), 'Downloads', 'Shore POS Products.xlsx'),
-    date_format='YYYY-MM-DD',
-    datetime_format='YYYY-MM-DD HH:MM:SS',
-    engine='xlsxwriter',
-    engine_kwargs={'options': {'strings_to_formulas': False, 'strings_to_urls': False}},
-) as writer:
-    shorepos_products_df.to_excel(excel_writer=writer, sheet_name='Shore POS Products', na_rep='', header=True, index=False, index_label=None, freeze_panes=(1, 0))
+else:
+    with pd.ExcelWriter(
+        path=shorepos_products_path,
+        date_format='YYYY-MM-DD',
+        datetime_format='YYYY-MM-DD HH:MM:SS',
+        engine='xlsxwriter',
+        engine_kwargs={'options': {'strings_to_formulas': False, 'strings_to_urls': False}},
+    ) as writer:
+        shorepos_products_df.to_excel(excel_writer=writer, sheet_name='Shore POS Products', na_rep='', header=True, index=False, index_label=None, freeze_panes=(1, 0))
 
 # Delete objects
-del shorepos_categories, shorepos_products, shorepos_taxes
+del shorepos_categories, shorepos_products, shorepos_products_df, shorepos_products_path, shorepos_taxes